@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ajuste.py
+------------
+
+Ajuste automático de los parámetros del temple simulado: la
+calendarización, la tolerancia, los pesos del costo y el generador de
+vecinos.
+
+Cada configuración se prueba con varias semillas en paralelo. Las peores
+configuraciones se descartan por mitades sucesivas (successive halving)
+y cada prueba terminada se guarda en disco, de manera que si se
+interrumpe un ajuste se puede continuar donde se quedó.
+
+"""
+
+__author__ = 'BrayanDurazo'
+
+import blocales
+import nreinas
+import itertools
+import json
+import os
+import time
+from multiprocessing import Pool
+
+
+def fabrica_nreinas(config):
+    """
+    Construye el problema de las n reinas para una configuración. La
+    calidad de la solución es el mismo número de conflictos.
+
+    @param config: Diccionario con la configuración (se usa la llave n).
+
+    @return: Una tupla (problema, referencia) donde referencia es el
+             problema con el que se mide la calidad de la solución.
+
+    """
+    problema = nreinas.ProblemaNreinas(config.get('n', 32))
+    return problema, problema
+
+
+def fabrica_grafo(config):
+    """
+    Construye el problema de dibujar el grafo sencillo de ejemplo para
+    una configuración. Como los pesos cambian el costo, la calidad se
+    mide siempre con los pesos por default.
+
+    @param config: Diccionario con la configuración (se usan las llaves
+                   pesos y vecino).
+
+    @return: Una tupla (problema, referencia).
+
+    """
+    import dibuja_grafo
+
+    vertices = dibuja_grafo.VERTICES_SENCILLO
+    aristas = dibuja_grafo.ARISTAS_SENCILLO
+    referencia = dibuja_grafo.problema_grafica_grafo(vertices, aristas)
+    if config.get('pesos') is None:
+        problema = referencia
+    else:
+        problema = dibuja_grafo.problema_grafica_grafo(vertices, aristas,
+                                                       pesos=config['pesos'])
+    vecino = config.get('vecino', 'vecino_aleatorio')
+    if vecino != 'vecino_aleatorio':
+        problema.vecino_aleatorio = getattr(problema, vecino)
+    return problema, referencia
+
+
+FABRICAS = {'nreinas': fabrica_nreinas,
+            'grafo': fabrica_grafo}
+
+
+def configuraciones(espacio):
+    """
+    Genera todas las configuraciones de un espacio de búsqueda.
+
+    @param espacio: Diccionario cuyas llaves son los nombres de los
+                    parámetros y cuyos valores son listas con los
+                    valores a probar, por ejemplo
+                    {'calendarización': [None, 'Logaritmo'],
+                     'tol': [0.001, 0.0004]}
+
+    @return: Una lista de diccionarios, uno por configuración.
+
+    """
+    nombres = sorted(espacio)
+    return [dict(zip(nombres, valores)) for valores in
+            itertools.product(*(espacio[nombre] for nombre in nombres))]
+
+
+def clave(problema, config, semilla):
+    """
+    Llave con la que se guarda una prueba en el cache.
+
+    """
+    return json.dumps([problema, config, semilla], sort_keys=True)
+
+
+def prueba(trabajo):
+    """
+    Realiza una prueba del temple simulado (se ejecuta en un proceso
+    del pool, por eso recibe un solo argumento).
+
+    @param trabajo: Tupla (problema, config, semilla) con el nombre del
+                    problema en FABRICAS, la configuración y la semilla.
+
+    @return: Un diccionario con la prueba, la calidad de la solución y
+             el tiempo de ejecución en segundos.
+
+    """
+    nombre, config, semilla = trabajo
+    problema, referencia = FABRICAS[nombre](config)
+
+    t_inicial = time.time()
+    estado = blocales.temple_simulado(
+        problema, config.get('calendarización'), config.get('tol', 0.001),
+        aleatorio=blocales.FlujoAleatorio(semilla))
+    t_final = time.time()
+
+    return {'problema': nombre,
+            'config': config,
+            'semilla': semilla,
+            'calidad': referencia.costo(estado),
+            'tiempo': t_final - t_inicial}
+
+
+def lee_cache(archivo):
+    """
+    Lee las pruebas terminadas de un archivo (una prueba en JSON por
+    línea). Las líneas incompletas, de una ejecución interrumpida, se
+    ignoran.
+
+    @return: Un diccionario con las pruebas indexadas por su clave.
+
+    """
+    cache = {}
+    if archivo is None or not os.path.exists(archivo):
+        return cache
+    with open(archivo) as f:
+        for linea in f:
+            try:
+                r = json.loads(linea)
+            except ValueError:
+                continue
+            cache[clave(r['problema'], r['config'], r['semilla'])] = r
+    return cache
+
+
+def resume(problema, vivas, cache, semillas, ronda):
+    """
+    Resume las pruebas de cada configuración con las primeras semillas.
+
+    @return: Una lista de diccionarios ordenada de la mejor a la peor
+             calidad promedio (los empates conservan su orden).
+
+    """
+    resultados = []
+    for config in vivas:
+        pruebas = [cache[clave(problema, config, s)] for s in range(semillas)]
+        resultados.append({
+            'config': config,
+            'semillas': semillas,
+            'ronda': ronda,
+            'final': False,
+            'calidad': sum(r['calidad'] for r in pruebas) / semillas,
+            'mejor': min(r['calidad'] for r in pruebas),
+            'tiempo': sum(r['tiempo'] for r in pruebas) / semillas})
+    resultados.sort(key=lambda r: r['calidad'])
+    return resultados
+
+
+def ajusta(problema, espacio, semillas=4, eta=2, procesos=None,
+           archivo='ajuste_cache.jsonl'):
+    """
+    Ajusta los parámetros del temple simulado por mitades sucesivas.
+
+    En la primer ronda todas las configuraciones se prueban con una
+    semilla, y en cada ronda siguiente solo sobrevive la mejor fracción
+    1/eta de las configuraciones, que se prueban con eta veces más
+    semillas, hasta llegar a semillas. Solo se compara la calidad: las
+    configuraciones empatadas con la última que sobrevive también
+    sobreviven, para que el empate se decida con más semillas y no por
+    el tiempo.
+
+    @param problema: El nombre del problema en FABRICAS.
+    @param espacio: El espacio de búsqueda (ver configuraciones).
+    @param semillas: Número máximo de semillas por configuración.
+    @param eta: Factor de descarte en cada ronda.
+    @param procesos: Número de procesos (None para usar todos los
+                     núcleos).
+    @param archivo: Archivo donde se guardan las pruebas terminadas, o
+                    None para no guardarlas.
+
+    @return: La lista de resultados de todas las configuraciones (ver
+             resume), cada una con la ronda en la que se probó por
+             última vez y si llegó a la ronda final. Primero van las
+             finalistas y después las descartadas de la última ronda a
+             la primera; dentro de cada ronda se ordenan por calidad
+             promedio y después por tiempo promedio.
+
+    """
+    cache = lee_cache(archivo)
+    vivas = configuraciones(espacio)
+    descartadas = []
+    n_semillas, ronda = 1, 1
+
+    with Pool(procesos) as pool:
+        while True:
+            pendientes = [(problema, config, s)
+                          for config in vivas for s in range(n_semillas)
+                          if clave(problema, config, s) not in cache]
+            for r in pool.imap_unordered(prueba, pendientes):
+                cache[clave(r['problema'], r['config'], r['semilla'])] = r
+                if archivo is not None:
+                    with open(archivo, 'a') as f:
+                        f.write(json.dumps(r) + "\n")
+
+            resultados = resume(problema, vivas, cache, n_semillas, ronda)
+            if n_semillas >= semillas or len(vivas) == 1:
+                for r in resultados:
+                    r['final'] = True
+                # Primero las que llegaron más lejos: una configuración
+                # descartada con una sola semilla no se compara con las
+                # finalistas
+                todas = resultados + descartadas
+                todas.sort(key=lambda r: (-r['ronda'], r['calidad'],
+                                          r['tiempo']))
+                return todas
+
+            quedan = max(1, len(vivas) // eta)
+            while (quedan < len(resultados) and
+                   resultados[quedan]['calidad'] ==
+                   resultados[quedan - 1]['calidad']):
+                quedan += 1
+            descartadas.extend(resultados[quedan:])
+            vivas = [r['config'] for r in resultados[:quedan]]
+            n_semillas, ronda = min(semillas, n_semillas * eta), ronda + 1
+
+
+def tabla(resultados):
+    """
+    Genera una tabla con los resultados ordenados de un ajuste.
+
+    @return: Una cadena con la tabla.
+
+    """
+    renglones = ["lugar".center(8) + "calidad".center(12) +
+                 "mejor".center(12) + "tiempo".center(12) +
+                 "semillas".center(10) + "ronda".center(10) +
+                 "configuración"]
+    for lugar, r in enumerate(resultados, 1):
+        renglones.append(str(lugar).center(8) +
+                         "{:.3f}".format(r['calidad']).center(12) +
+                         "{:.3f}".format(r['mejor']).center(12) +
+                         "{:.3f}".format(r['tiempo']).center(12) +
+                         str(r['semillas']).center(10) +
+                         ("final" if r['final'] else
+                          "{}".format(r['ronda'])).center(10) +
+                         json.dumps(r['config'], sort_keys=True,
+                                    ensure_ascii=False))
+    return "\n".join(renglones)
+
+
+if __name__ == "__main__":
+
+    espacio_nreinas = {'n': [32],
+                       'calendarización': [None, 'Logaritmo', 'Exponencial'],
+                       'tol': [0.001, 0.0004]}
+    print(tabla(ajusta('nreinas', espacio_nreinas)))
+
+    espacio_grafo = {'calendarización': [None, 'Logaritmo'],
+                     'tol': [0.001, 0.0004],
+                     'pesos': [[2.0, 4.0, 3.0, 1.0], [1.0, 4.0, 2.0, 1.0]],
+                     'vecino': ['vecino_aleatorio', 'vecino_aleatorio_simple']}
+    print(tabla(ajusta('grafo', espacio_grafo)))
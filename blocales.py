@@ -10,10 +10,118 @@ Algoritmos generales para búsquedas locales
 
 __author__ = 'juliowaissman'
 
+import os
+from array import array
 from itertools import takewhile
+from itertools import islice
+from itertools import chain
 from math import log
 from math import exp
-from random import random
+from random import Random
+from time import perf_counter
+
+
+class FlujoAleatorio(object):
+    """
+    Flujo de números aleatorios para una ejecución de búsqueda local.
+
+    Los números se generan por bloques con un random.Random propio y se
+    entregan uno a uno, sin usar el generador global del módulo random.
+    Así cada ejecución se puede reproducir a partir de su semilla (la
+    misma secuencia en cualquier instalación, pues solo depende de la
+    biblioteca estándar), y ejecuciones con la misma semilla pero
+    distinto flujo (por ejemplo una por proceso) usan secuencias
+    independientes.
+
+    Los métodos uniforme y exponencial son iteradores de C, por lo que
+    cuestan menos que una llamada a random.random.
+
+    """
+    def __init__(self, semilla=None, flujo=0, bloque=4096):
+        """
+        @param semilla: Un entero con la semilla (None para usar una
+                        semilla del sistema operativo).
+        @param flujo: Un entero que distingue flujos con la misma
+                      semilla.
+        @param bloque: Cantidad de números generados a la vez.
+
+        """
+        self.semilla, self.flujo, self.bloque = semilla, flujo, bloque
+        # Una semilla de texto se convierte con sha512, por lo que flujos
+        # con semillas o números de flujo distintos son independientes
+        azar = Random(None if semilla is None else
+                      "{}:{}".format(semilla, flujo)).random
+        uniformes = lambda: [azar() for _ in range(bloque)]
+        exponenciales = lambda: [-log(1.0 - azar()) for _ in range(bloque)]
+
+        # iter(f, None) llama a f cada vez que se acaba un bloque
+        self.uniforme = chain.from_iterable(iter(uniformes, None)).__next__
+        self.exponencial = chain.from_iterable(
+            iter(exponenciales, None)).__next__
+
+    def __getstate__(self):
+        # Al copiar el flujo (por ejemplo a otro proceso) se reinicia
+        return (self.semilla, self.flujo, self.bloque)
+
+    def __setstate__(self, estado):
+        self.__init__(*estado)
+
+    def entero(self, a, b):
+        """
+        @return: Un entero uniforme entre a y b, incluyéndolos (como
+                 random.randint).
+
+        """
+        return a + int(self.uniforme() * (b - a + 1))
+
+    def par(self, n):
+        """
+        @return: Dos índices distintos de range(n) (como
+                 random.sample(range(n), 2), también produce un
+                 ValueError si n < 2).
+
+        """
+        if n < 2:
+            raise ValueError("No hay dos índices distintos en range({})"
+                             .format(n))
+        i = int(self.uniforme() * n)
+        j = int(self.uniforme() * (n - 1))
+        return (i, j + 1) if j >= i else (i, j)
+
+    def revuelve(self, x):
+        """
+        Revuelve la lista x en su lugar (como random.shuffle).
+
+        """
+        for i in range(len(x) - 1, 0, -1):
+            j = int(self.uniforme() * (i + 1))
+            x[i], x[j] = x[j], x[i]
+
+
+# Flujo que usan los problemas sin un flujo propio. Se crea la primera vez
+# que se usa en cada proceso, y se descarta en los procesos hijos creados
+# con fork para que no repitan la secuencia del proceso padre.
+_flujo_por_default = None
+
+
+def _descarta_flujo_por_default():
+    global _flujo_por_default
+    _flujo_por_default = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_descarta_flujo_por_default)
+
+
+def flujo_por_default():
+    """
+    @return: El FlujoAleatorio (sin semilla) de este proceso.
+
+    """
+    global _flujo_por_default
+    if _flujo_por_default is None:
+        _flujo_por_default = FlujoAleatorio()
+    return _flujo_por_default
 
 
 class Problema(object):
@@ -23,11 +131,26 @@ class Problema(object):
 
     a) Todos los métodos requieren de implementar costo y estado_aleatorio
 
-    b) descenso_colinas  requiere de implementar el método vecinos
+    b) descenso_colinas  requiere de implementar el método vecinos (y en
+       modo 'muestreo' el método vecino_aleatorio)
 
     c) temple_simulado requiere vecino_aleatorio
 
+    Los métodos aleatorios deben de usar el flujo self.aleatorio (ver
+    FlujoAleatorio), que descenso_colinas y temple_simulado reemplazan
+    cuando se les da un flujo propio. Mientras no se le asigne uno, el
+    problema usa el flujo por default del proceso.
+
     """
+    @property
+    def aleatorio(self):
+        flujo = self.__dict__.get('_aleatorio')
+        return flujo_por_default() if flujo is None else flujo
+
+    @aleatorio.setter
+    def aleatorio(self, flujo):
+        self._aleatorio = flujo
+
     def estado_aleatorio(self):
         """
         @return Una tupla que describe un estado
@@ -46,6 +169,22 @@ class Problema(object):
         """
         raise NotImplementedError("Este metodo debe ser implementado")
 
+    def vecinos_aleatorios(self, estado):
+        """
+        Generador de los vecinos de un estado en orden aleatorio. Por
+        default genera todos los vecinos y los revuelve, pero conviene
+        sobrecargarlo si se pueden generar en orden aleatorio sin tener
+        que construirlos todos antes.
+
+        @param estado: Una tupla que describe un estado
+
+        @return: Un generador de estados vecinos
+
+        """
+        vecinos = list(self.vecinos(estado))
+        self.aleatorio.revuelve(vecinos)
+        return iter(vecinos)
+
     def vecino_aleatorio(self, estado):
         """
         Genera un vecino de un estado en forma aleatoria.
@@ -70,58 +209,321 @@ class Problema(object):
         raise NotImplementedError("Este metodo debe ser implementado")
 
 
-def descenso_colinas(problema, maxit=1e6):
+# Copia del problema, memoria compartida y tipo del estado en cada proceso
+# de un EvaluadorParalelo
+_problema_proceso = None
+_memoria_proceso = None
+_tipo_proceso = None
+
+
+def _inicia_proceso(problema, nombre, tipo):
+    # multiprocessing solo se importa al usar un EvaluadorParalelo, para
+    # no hacer más lenta la importación de este módulo
+    from multiprocessing import shared_memory
+
+    global _problema_proceso, _memoria_proceso, _tipo_proceso
+    _problema_proceso = problema
+    _memoria_proceso = shared_memory.SharedMemory(name=nombre)
+    _tipo_proceso = tipo
+
+
+def _evalua_parte(trabajo):
+    """
+    Evalúa los vecinos parte, parte + partes, parte + 2 * partes, ... del
+    estado compartido.
+
+    @return: Una tupla (costo, indice) con el mejor vecino de la parte,
+             o (None, None) si la parte no tiene vecinos.
+
+    """
+    parte, partes, n = trabajo
+    # La vista se libera en cada tarea: si quedara viva, la memoria
+    # compartida no se podría cerrar al terminar el proceso
+    with _memoria_proceso.buf.cast(_tipo_proceso) as vista:
+        estado = tuple(vista[:n])
+    costo_mejor, indice_mejor = None, None
+    vecinos = islice(_problema_proceso.vecinos(estado), parte, None, partes)
+    for indice, vecino in enumerate(vecinos):
+        costo = _problema_proceso.costo(vecino)
+        if costo_mejor is None or costo < costo_mejor:
+            costo_mejor, indice_mejor = costo, parte + indice * partes
+    return costo_mejor, indice_mejor
+
+
+class EvaluadorParalelo(object):
+    """
+    Evalúa en paralelo los vecinos de un estado, para cuando el costo es
+    caro. Los vecinos se reparten entre los procesos de un pool que se
+    mantiene vivo entre pasos (y entre reinicios, si se usa el mismo
+    evaluador). El estado se escribe en memoria compartida en lugar de
+    mandarse a cada proceso, y cada proceso regresa solo el índice y el
+    costo de su mejor vecino.
+
+    Se usa como
+
+    with EvaluadorParalelo(problema) as evaluador:
+        estado = descenso_colinas(problema, evaluador=evaluador)
+
+    El problema se copia a cada proceso una sola vez, por lo que su
+    método vecinos debe generar siempre los vecinos en el mismo orden.
+    El pool y la memoria compartida se crean en la primera llamada a
+    mejor_vecino, cuando se conoce el tamaño del estado.
+
+    """
+    def __init__(self, problema, procesos=None, tipo='q'):
+        """
+        @param problema: Un objeto de una clase heredada de Problema.
+        @param procesos: Número de procesos (None para usar todos los
+                         núcleos).
+        @param tipo: Código de tipo (del módulo array) de las entradas del
+                     estado, 'q' para enteros o 'd' para flotantes.
+
+        """
+        self.problema = problema
+        self.procesos = procesos or os.cpu_count()
+        self.tipo = tipo
+        self._n, self._memoria, self._estado, self._pool = 0, None, None, None
+
+    def _inicia(self, n):
+        """
+        Crea la memoria compartida para un estado de tamaño n y el pool.
+
+        """
+        from multiprocessing import Pool
+        from multiprocessing import shared_memory
+
+        self._n = n
+        self._memoria = shared_memory.SharedMemory(
+            create=True, size=n * array(self.tipo).itemsize)
+        self._estado = self._memoria.buf.cast(self.tipo)
+        self._pool = Pool(self.procesos, _inicia_proceso,
+                          (self.problema, self._memoria.name, self.tipo))
+
+    def mejor_vecino(self, estado):
+        """
+        Encuentra el mejor vecino de un estado (el primero, en el orden de
+        problema.vecinos, si hay empates).
+
+        @param estado: Una tupla que describe un estado
+
+        @return: Una tupla (vecino, costo), o (None, None) si el estado no
+                 tiene vecinos.
+
+        """
+        if self._pool is None:
+            self._inicia(len(estado))
+        elif len(estado) != self._n:
+            raise ValueError("El estado no tiene el tamaño del primero")
+        self._estado[:self._n] = array(self.tipo, estado)
+        resultados = [r for r in
+                      self._pool.map(_evalua_parte,
+                                     [(parte, self.procesos, self._n)
+                                      for parte in range(self.procesos)])
+                      if r[1] is not None]
+        if not resultados:
+            return None, None
+        costo, indice = min(resultados)
+        vecino = next(islice(self.problema.vecinos(estado), indice, None))
+        return vecino, costo
+
+    def cierra(self):
+        """
+        Termina los procesos y libera la memoria compartida.
+
+        """
+        if self._pool is None:
+            return
+        self._pool.terminate()
+        self._pool.join()
+        self._estado.release()
+        self._memoria.close()
+        self._memoria.unlink()
+        self._n, self._memoria, self._estado, self._pool = 0, None, None, None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cierra()
+
+
+def descenso_colinas(problema, maxit=1e6, modo='completo', muestras=10,
+                     laterales=0, paciencia=10, aleatorio=None,
+                     tiempo_max=None, estadisticas=None, evaluador=None):
     """
     Busqueda local por descenso de colinas.
 
+    Hay tres formas de escoger el siguiente estado:
+
+    - 'completo': Se evalúan todos los vecinos y se escoge el mejor.
+    - 'primera_mejora': Se revisan los vecinos en orden aleatorio y se
+      escoge el primero que mejore el costo (o que no lo empeore, si
+      aun quedan movimientos laterales).
+    - 'muestreo': Se evalúan muestras vecinos aleatorios y se escoge el
+      mejor. Como una muestra sin mejora no implica un mínimo local, la
+      búsqueda termina hasta tener paciencia pasos seguidos sin mejora.
+
+    En todos los modos se permiten hasta laterales movimientos seguidos
+    a un vecino con el mismo costo, para poder salir de las mesetas.
+
     @param problema: Un objeto de una clase heredada de Problema
     @param maxit: Máximo número de iteraciones
+    @param modo: 'completo', 'primera_mejora' o 'muestreo'
+    @param muestras: Número de vecinos evaluados por paso en 'muestreo'
+    @param laterales: Máximo número de movimientos laterales seguidos
+    @param paciencia: Pasos seguidos sin mejora tolerados en 'muestreo'
+    @param aleatorio: Un FlujoAleatorio para esta ejecución, que se
+                      asigna a problema.aleatorio (None para usar el
+                      que ya tiene el problema).
+    @param tiempo_max: Máximo tiempo de búsqueda en segundos. En los
+                       modos 'completo' y 'primera_mejora' también se
+                       revisa entre vecino y vecino.
+    @param estadisticas: Un diccionario en el que se suman las
+                         iteraciones realizadas (llave 'iteraciones').
+    @param evaluador: Un EvaluadorParalelo del problema para evaluar los
+                      vecinos en el modo 'completo'.
 
     @return: El estado con el menor costo encontrado
 
     """
+    if modo not in ('completo', 'primera_mejora', 'muestreo'):
+        raise ValueError("Modo de descenso de colinas desconocido: " + modo)
+    if aleatorio is not None:
+        problema.aleatorio = aleatorio
+
+    limite = None if tiempo_max is None else perf_counter() + tiempo_max
     estado = problema.estado_aleatorio()
     costo = problema.costo(estado)
+    quedan_laterales, fallos = laterales, 0
 
-    for _ in range(int(maxit)):
-        e = min(problema.vecinos(estado), key=problema.costo)
-        c = problema.costo(e)
-        if c >= costo:
+    iteraciones = 0
+    for iteraciones in range(1, int(maxit) + 1):
+        if limite is not None and perf_counter() > limite:
+            break
+        if modo == 'completo' and evaluador is not None:
+            e, c = evaluador.mejor_vecino(estado)
+            if e is None:
+                break
+        elif modo == 'completo':
+            # Si se acaba el tiempo a media revisión se usa el mejor de
+            # los vecinos revisados
+            e, c = None, None
+            for vecino in problema.vecinos(estado):
+                costo_vecino = problema.costo(vecino)
+                if c is None or costo_vecino < c:
+                    e, c = vecino, costo_vecino
+                if limite is not None and perf_counter() > limite:
+                    break
+            if e is None:
+                break
+        elif modo == 'primera_mejora':
+            # Si quedan movimientos laterales basta con no empeorar
+            e, c = None, None
+            for vecino in problema.vecinos_aleatorios(estado):
+                costo_vecino = problema.costo(vecino)
+                if (costo_vecino < costo or
+                        costo_vecino == costo and quedan_laterales > 0):
+                    e, c = vecino, costo_vecino
+                    break
+                if limite is not None and perf_counter() > limite:
+                    break
+            if e is None:
+                break
+        else:
+            vecinos = [problema.vecino_aleatorio(estado)
+                       for _ in range(muestras)]
+            e = min(vecinos, key=problema.costo)
+            c = problema.costo(e)
+
+        if c < costo:
+            quedan_laterales, fallos = laterales, 0
+        elif c == costo and quedan_laterales > 0:
+            quedan_laterales -= 1
+        elif modo == 'muestreo' and fallos < paciencia:
+            fallos += 1
+            continue
+        else:
             break
         estado, costo = e, c
+
+    if estadisticas is not None:
+        estadisticas['iteraciones'] = (estadisticas.get('iteraciones', 0) +
+                                       iteraciones)
     return estado
 
 
-def temple_simulado(problema, calendarización=None, tol=0.001):
+def temple_simulado(problema, calendarización=None, tol=0.001,
+                    estado_inicial=None, T_ini=None, maxit=None,
+                    aleatorio=None, tiempo_max=None, estadisticas=None):
     """
     Busqueda local por temple simulado
 
     @param problema: Un objeto de la clase `Problema`.
     @param calendarizador: Un generador de temperatura (simulación).
     @param tol: Temperatura mínima considerada diferente a cero.
+    @param estado_inicial: Estado desde el cual se inicia la búsqueda. Si
+                           es None se usa un estado aleatorio.
+    @param T_ini: Temperatura inicial. Si es None se estima a partir de
+                  la dispersión del costo de estados aleatorios.
+    @param maxit: Máximo número de iteraciones (None para no limitar).
+    @param aleatorio: Un FlujoAleatorio para esta ejecución, que se
+                      asigna a problema.aleatorio (None para usar el
+                      que ya tiene el problema).
+    @param tiempo_max: Máximo tiempo de búsqueda en segundos, incluyendo
+                       la estimación de T_ini.
+    @param estadisticas: Un diccionario en el que se suman las
+                         iteraciones realizadas (llave 'iteraciones').
 
     @return: El estado con el menor costo encontrado
 
     """
-    costos = [problema.costo(problema.estado_aleatorio())
-    for _ in range(10 * len(problema.estado_aleatorio()))]
-    minimo,  maximo = min(costos), max(costos)
-    T_ini = 2 * (maximo - minimo)
+    limite = None if tiempo_max is None else perf_counter() + tiempo_max
+    if aleatorio is not None:
+        problema.aleatorio = aleatorio
+    if T_ini is None:
+        # Con un tiempo máximo, la estimación de T_ini usa a lo más la
+        # décima parte (y al menos dos estados)
+        costos = []
+        for _ in range(10 * len(problema.estado_aleatorio())):
+            costos.append(problema.costo(problema.estado_aleatorio()))
+            if (limite is not None and len(costos) >= 2 and
+                    perf_counter() > limite - 0.9 * tiempo_max):
+                break
+        minimo,  maximo = min(costos), max(costos)
+        T_ini = 2 * (maximo - minimo)
     if calendarización is None: 
         calendarizador = (T_ini/(1 + i) for i in range(int(1e10)))
-    elif calendarización is "Logaritmo":
+    elif calendarización == "Logaritmo":
         calendarizador = ((T_ini/(1 + i*log(i))) for i in range(1,int(1e10)+1))
-    elif calendarización is "Exponencial":
+    elif calendarización == "Exponencial":
         calendarizador = ((T_ini * exp(-tol*i)) for i in range(int(1e10)))
-    estado = problema.estado_aleatorio()
+    if maxit is not None:
+        calendarizador = islice(calendarizador, int(maxit))
+    if estado_inicial is None:
+        estado = problema.estado_aleatorio()
+    else:
+        estado = tuple(estado_inicial)
     costo = problema.costo(estado)
+    exponencial = problema.aleatorio.exponencial
 
-    for T in takewhile(lambda i: i > tol, calendarizador):
+    temperaturas = takewhile(lambda i: i > tol, calendarizador)
+    if limite is not None:
+        temperaturas = takewhile(lambda _: perf_counter() < limite,
+                                 temperaturas)
+
+    iteraciones = 0
+    for iteraciones, T in enumerate(temperaturas, 1):
 
         vecino = problema.vecino_aleatorio(estado)
         costo_vecino = problema.costo(vecino)
         incremento_costo = costo_vecino - costo
 
-        if incremento_costo <= 0 or random() < exp(-incremento_costo / T):
+        # random() < exp(-incremento_costo / T) es lo mismo que pedir
+        # que -log(random()), una exponencial, supere incremento_costo / T
+        if incremento_costo <= 0 or incremento_costo < T * exponencial():
             estado, costo = vecino, costo_vecino
+
+    if estadisticas is not None:
+        estadisticas['iteraciones'] = (estadisticas.get('iteraciones', 0) +
+                                       iteraciones)
     return estado
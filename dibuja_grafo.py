@@ -11,22 +11,57 @@ Estos métodos no son los que se utilizan en el dibujo de
 gráfos por computadora pero da una idea de la utilidad de los métodos de
 optimización en un problema divertido.
 
-Para realizar este problema es necesario contar con el módulo Pillow
+Para dibujar el grafo es necesario contar con el módulo Pillow
 instalado (en Anaconda se instala por default. Si no se encuentr instalado,
 desde la termnal se puede instalar utilizando
 
 $pip install pillow
 
+El módulo solo se importa al dibujar, por lo que no hace falta para
+encontrar la posición de los vértices.
+
 """
 
 __author__ = 'BrayanDurazo'
 
 import blocales
-import random
 import itertools
+import json
 import math
+import os
+import tempfile
 import time
-from PIL import Image, ImageDraw
+
+
+# Grafo sencillo de ejemplo
+VERTICES_SENCILLO = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M']
+ARISTAS_SENCILLO = [('B', 'G'),
+                    ('E', 'F'),
+                    ('H', 'E'),
+                    ('D', 'B'),
+                    ('H', 'G'),
+                    ('A', 'E'),
+                    ('C', 'F'),
+                    ('H', 'B'),
+                    ('F', 'A'),
+                    ('C', 'B'),
+                    ('H', 'F'),
+                    ('H', 'I'),
+                    ('H', 'J'),
+                    ('H', 'K'),
+                    ('H', 'L'),
+                    ('H', 'M'),
+                    ('I', 'J'),
+                    ('I', 'K'),
+                    ('I', 'L'),
+                    ('I', 'M'),
+                    ('J', 'K'),
+                    ('J', 'L'),
+                    ('J', 'M'),
+                    ('K', 'L'),
+                    ('K', 'M'),
+                    ('L', 'M'),
+                    ('M', 'A')]
 
 
 class problema_grafica_grafo(blocales.Problema):
@@ -36,7 +71,8 @@ class problema_grafica_grafo(blocales.Problema):
 
     """
 
-    def __init__(self, vertices, aristas, dimension_imagen=400):
+    def __init__(self, vertices, aristas, dimension_imagen=400,
+                 pesos=(2.0, 4.0, 3.0, 1.0)):
         """
         Un grafo se define como un conjunto de vertices, en forma de
         lista (no conjunto, el orden es importante a la hora de
@@ -51,11 +87,18 @@ class problema_grafica_grafo(blocales.Problema):
                         definen las aristas.
         @param dimension_imagen: Entero con la dimension de la imagen
                                  en pixeles (cuadrada por facilidad).
+        @param pesos: Tupla (K1, K2, K3, K4) con el peso lineal de cada
+                      criterio del costo.
 
         """
         self.vertices = vertices
         self.aristas = aristas
         self.dim = dimension_imagen
+        self.pesos = tuple(pesos)
+
+        # Índices de los vértices que pueden moverse al buscar vecinos
+        # (None para todos)
+        self.moviles = None
 
     def estado_aleatorio(self):
         """
@@ -73,9 +116,36 @@ class problema_grafica_grafo(blocales.Problema):
                  cada vertice en la imagen.
 
         """
-        return tuple(random.randint(10, self.dim - 10) for _ in
+        return tuple(self.aleatorio.entero(10, self.dim - 10) for _ in
                      range(2 * len(self.vertices)))
 
+    def vecinos(self, estado, dmax=10):
+        """
+        Generador de los vecinos de un estado: cada coordenada de cada
+        vértice se mueve dmax pixeles hacia un lado y hacia el otro (sin
+        salir de la imagen). Si self.moviles no es None, solo se mueven
+        esos vértices.
+
+        @param estado: Una tupla con el estado.
+        @param dmax: Desplazamiento en pixeles.
+
+        @return: Un generador de estados vecinos.
+
+        """
+        vecino = list(estado)
+        if self.moviles is None:
+            indices = range(len(estado))
+        else:
+            indices = [2 * v + eje for v in self.moviles for eje in (0, 1)]
+        for i in indices:
+            valor = estado[i]
+            for nuevo in (max(10, valor - dmax),
+                          min(self.dim - 10, valor + dmax)):
+                if nuevo != valor:
+                    vecino[i] = nuevo
+                    yield tuple(vecino)
+            vecino[i] = valor
+
     def vecino_aleatorio(self, estado, dmax=10):
         """
         Encuentra un vecino en forma aleatoria. En estea primera
@@ -100,9 +170,15 @@ class problema_grafica_grafo(blocales.Problema):
                             vecino[i] + random.randint(-dmax,  dmax)))
         return tuple(vecino)
         """
+        # Al refinar solo una región (self.moviles) se necesitan movimientos
+        # locales, pues los saltos de la manera propuesta casi nunca se
+        # aceptan a baja temperatura
+        if self.moviles is not None:
+            return self.vecino_aleatorio_simple(estado, dmax)
+
         #Manera propuesta
         vecino = list(estado)
-        i = random.randint(0, len(vecino) - 2)
+        i = self.aleatorio.entero(0, len(vecino) - 2)
         mas_cercano_x = 0
         mas_cercano_y = 0
         for x in range(0, len(vecino) - 1, 2):
@@ -116,8 +192,8 @@ class problema_grafica_grafo(blocales.Problema):
             elif abs(vecino[y] - vecino[i]) < mas_cercano_y :
                 mas_cercano_y = abs(vecino[y] - vecino[i])
                 
-        vecino[i] = max(10, min(self.dim - 10, vecino[i] + random.randint(-mas_cercano_x,  mas_cercano_x)))
-        vecino[i+1] = max(10, min(self.dim - 10, vecino[i] + random.randint(-mas_cercano_y,  mas_cercano_y)))
+        vecino[i] = max(10, min(self.dim - 10, vecino[i] + self.aleatorio.entero(-mas_cercano_x,  mas_cercano_x)))
+        vecino[i+1] = max(10, min(self.dim - 10, vecino[i] + self.aleatorio.entero(-mas_cercano_y,  mas_cercano_y)))
         return tuple(vecino)
 
         #######################################################################
@@ -138,6 +214,30 @@ class problema_grafica_grafo(blocales.Problema):
         # (El tiempo fue el medido con la calendarización default y sin utilizar
         # el criterio propio ni el de los ángulos).
 
+    def vecino_aleatorio_simple(self, estado, dmax=10):
+        """
+        El vecino aleatorio original: toma una coordenada al azar y le
+        suma o resta a lo más dmax pixeles. Se conserva para poder
+        comparar generadores de vecinos al ajustar el temple simulado.
+
+        @param estado: Una tupla con el estado.
+        @param dmax: Desplazamiento máximo en pixeles.
+
+        @return: Una tupla con un estado vecino al estado de entrada.
+
+        """
+        vecino = list(estado)
+        if self.moviles is None:
+            i = self.aleatorio.entero(0, len(vecino) - 1)
+        else:
+            i = (2 * self.moviles[self.aleatorio.entero(0,
+                                                        len(self.moviles) - 1)]
+                 + self.aleatorio.entero(0, 1))
+        vecino[i] = max(10,
+                        min(self.dim - 10,
+                            vecino[i] + self.aleatorio.entero(-dmax,  dmax)))
+        return tuple(vecino)
+
     def costo(self, estado):
         """
         Encuentra el costo de un estado. En principio el costo de un estado
@@ -152,12 +252,9 @@ class problema_grafica_grafo(blocales.Problema):
 
         """
 
-        # Inicializa fáctores lineales para los criterios más importantes
-        # (default solo cuanta el criterio 1)
-        K1 = 2.0
-        K2 = 4.0
-        K3 = 3.0
-        K4 = 1.0
+        # Fáctores lineales para los criterios más importantes
+        # (por default 2, 4, 3 y 1)
+        K1, K2, K3, K4 = self.pesos
 
         # Genera un diccionario con el estado y la posición
         estado_dic = self.estado2dic(estado)
@@ -385,6 +482,111 @@ class problema_grafica_grafo(blocales.Problema):
         return {self.vertices[i]: (estado[2 * i], estado[2 * i + 1])
                 for i in range(len(self.vertices))}
 
+    def contrae(self):
+        """
+        Contrae el grafo uniendo pares de vértices adyacentes, a partir de
+        un emparejamiento maximal de las aristas tomado en orden
+        aleatorio. Cada par queda representado en el grafo contraído por
+        uno de sus dos vértices, y las aristas se conservan entre los
+        representantes (sin repetir y sin lazos).
+
+        @return: Una tupla (contraido, representante) donde contraido es
+                 un problema_grafica_grafo con la misma dimensión de
+                 imagen, y representante es un diccionario que asigna a
+                 cada vértice de este grafo su vértice en el grafo
+                 contraído.
+
+        """
+        adyacentes = {v: [] for v in self.vertices}
+        for (v1, v2) in self.aristas:
+            if v1 != v2:
+                adyacentes[v1].append(v2)
+                adyacentes[v2].append(v1)
+
+        # Se empareja cada vértice libre con su vecino libre de menor
+        # grado, para que los vértices contraídos queden balanceados
+        orden = list(self.vertices)
+        self.aleatorio.revuelve(orden)
+        representante = {}
+        for v in orden:
+            if v in representante:
+                continue
+            representante[v] = v
+            libres = [u for u in adyacentes[v] if u not in representante]
+            if libres:
+                u = min(libres, key=lambda u: len(adyacentes[u]))
+                representante[u] = v
+
+        vertices = [v for v in self.vertices if representante[v] == v]
+        indice = {v: i for (i, v) in enumerate(vertices)}
+        aristas = []
+        vistas = set()
+        for (v1, v2) in self.aristas:
+            r1, r2 = representante[v1], representante[v2]
+            if r1 == r2:
+                continue
+            if indice[r1] > indice[r2]:
+                r1, r2 = r2, r1
+            if (r1, r2) not in vistas:
+                vistas.add((r1, r2))
+                aristas.append((r1, r2))
+
+        contraido = problema_grafica_grafo(vertices, aristas, self.dim,
+                                           self.pesos)
+        contraido.aleatorio = self.aleatorio
+        return contraido, representante
+
+    def proyecta(self, estado_contraido, contraido, representante,
+                 min_dist=50):
+        """
+        Proyecta un estado del grafo contraído a un estado de este
+        grafo. Cada representante conserva su posición y el vértice que
+        se unió con él se coloca a min_dist pixeles de distancia, para
+        no penalizarlos en separacion_vertices, en dirección al promedio
+        de sus vecinos fuera del par (o en una dirección al azar si no
+        tiene). Si se sale de la imagen se refleja hacia el otro lado.
+
+        @param estado_contraido: Una tupla con un estado de contraido.
+        @param contraido: El grafo contraído obtenido con contrae.
+        @param representante: El diccionario obtenido con contrae.
+        @param min_dist: Distancia en pixeles entre los vértices unidos.
+
+        @return: Una tupla con un estado de este grafo.
+
+        """
+        lugar = contraido.estado2dic(estado_contraido)
+        adyacentes = {v: [] for v in self.vertices}
+        for (v1, v2) in self.aristas:
+            adyacentes[v1].append(v2)
+            adyacentes[v2].append(v1)
+
+        estado = []
+        for v in self.vertices:
+            x, y = lugar[representante[v]]
+            if representante[v] != v:
+                fuera = [lugar[representante[u]] for u in adyacentes[v]
+                         if representante[u] != representante[v]]
+                dx, dy = 0, 0
+                if fuera:
+                    dx = sum(p[0] for p in fuera) / len(fuera) - x
+                    dy = sum(p[1] for p in fuera) / len(fuera) - y
+                if dx == 0 and dy == 0:
+                    angulo = 2 * math.pi * self.aleatorio.uniforme()
+                    dx, dy = math.cos(angulo), math.sin(angulo)
+
+                # Se redondea hacia afuera para no quedar a menos de
+                # min_dist
+                norma = math.hypot(dx, dy)
+                dx = math.ceil(min_dist * abs(dx) / norma) * (1 if dx > 0
+                                                              else -1)
+                dy = math.ceil(min_dist * abs(dy) / norma) * (1 if dy > 0
+                                                              else -1)
+                x += dx if 10 <= x + dx <= self.dim - 10 else -dx
+                y += dy if 10 <= y + dy <= self.dim - 10 else -dy
+            estado.append(max(10, min(self.dim - 10, x)))
+            estado.append(max(10, min(self.dim - 10, y)))
+        return tuple(estado)
+
     def dibuja_grafo(self, estado=None, filename="prueba.gif"):
         """
         Dibuja el grafo utilizando el modulo pillow, donde estado es una
@@ -396,6 +598,8 @@ class problema_grafica_grafo(blocales.Problema):
         aleatoria.
 
         """
+        from PIL import Image, ImageDraw
+
         if not estado:
             estado = self.estado_aleatorio()
 
@@ -415,6 +619,283 @@ class problema_grafica_grafo(blocales.Problema):
         imagen.save(filename)
 
 
+def temple_multinivel(grafo, min_vertices=10, calendarización=None,
+                      tol=0.001, T_refinamiento=1.0, it_burdo=2000,
+                      it_refinamiento=50, fraccion_burdo=0.25, aleatorio=None, tiempo_max=None,
+                      estadisticas=None):
+    """
+    Dibuja un grafo por temple simulado multinivel. El grafo se contrae
+    repetidamente hasta tener a lo más min_vertices vértices (o hasta que
+    ya no se pueda contraer), se realiza el temple simulado sobre el
+    grafo más pequeño (a lo más it_burdo iteraciones por vértice), y
+    después se regresa nivel por nivel proyectando las posiciones y
+    refinándolas con un temple simulado corto a baja temperatura, de
+    it_refinamiento iteraciones por vértice y con movimientos locales
+    (vecino_aleatorio_simple).
+
+    Como en cada nivel se usa el mismo costo de problema_grafica_grafo,
+    el temple caro solo se hace sobre el grafo chico y los niveles
+    grandes solo necesitan ajustes locales.
+
+    @param grafo: Un objeto de la clase problema_grafica_grafo.
+    @param min_vertices: Número de vértices a partir del cual ya no se
+                         contrae el grafo.
+    @param calendarización: La calendarización usada en temple_simulado.
+    @param tol: Temperatura mínima considerada diferente a cero.
+    @param T_refinamiento: Temperatura inicial del refinamiento en cada
+                           nivel.
+    @param it_burdo: Máximo número de iteraciones por vértice del
+                     temple del grafo más pequeño.
+    @param it_refinamiento: Número de iteraciones por vértice del
+                            refinamiento en cada nivel.
+    @param fraccion_burdo: Fracción de tiempo_max para el temple del
+                           grafo más pequeño.
+    @param aleatorio: Un FlujoAleatorio para esta ejecución, que se
+                      comparte con todos los niveles.
+    @param tiempo_max: Máximo tiempo en segundos para todos los niveles.
+                       El resto del tiempo que no usa el grafo más
+                       pequeño se reparte entre los refinamientos en
+                       proporción al número de vértices de cada nivel.
+    @param estadisticas: Un diccionario en el que se suman las
+                         iteraciones de todos los niveles.
+
+    @return: Una tupla con un estado del grafo original.
+
+    """
+    limite = None if tiempo_max is None else time.time() + tiempo_max
+    if aleatorio is not None:
+        grafo.aleatorio = aleatorio
+    niveles = []
+    actual = grafo
+    while len(actual.vertices) > min_vertices:
+        contraido, representante = actual.contrae()
+        # Si ya casi no se contrae (o se pierden todas las aristas) no
+        # vale la pena agregar otro nivel
+        if (not contraido.aristas or
+                len(contraido.vertices) > 0.9 * len(actual.vertices)):
+            break
+        niveles.append((actual, contraido, representante))
+        actual = contraido
+
+    # El tiempo que le sobra a un nivel pasa a los siguientes (la
+    # proyección siempre se hace, para regresar un estado del grafo
+    # original)
+    def parte(fraccion):
+        if limite is None:
+            return None
+        return fraccion * max(0, limite - time.time())
+
+    estado = blocales.temple_simulado(
+        actual, calendarización, tol, maxit=it_burdo * len(actual.vertices),
+        tiempo_max=parte(fraccion_burdo if niveles else 1),
+        estadisticas=estadisticas)
+    pendientes = sum(len(fino.vertices) for (fino, _, _) in niveles)
+    for (fino, contraido, representante) in reversed(niveles):
+        estado = fino.proyecta(estado, contraido, representante)
+
+        # El refinamiento usa movimientos locales (todos los vértices son
+        # moviles) y la temperatura T_refinamiento/(1 + i) hasta la
+        # última iteración
+        maxit = it_refinamiento * len(fino.vertices)
+        anteriores = fino.moviles
+        fino.moviles = list(range(len(fino.vertices)))
+        try:
+            estado = blocales.temple_simulado(
+                fino, None, T_refinamiento / maxit, estado_inicial=estado,
+                T_ini=T_refinamiento, maxit=maxit,
+                tiempo_max=parte(len(fino.vertices) / pendientes),
+                estadisticas=estadisticas)
+        finally:
+            fino.moviles = anteriores
+        pendientes -= len(fino.vertices)
+    return estado
+
+
+class CacheDibujos(object):
+    """
+    Guarda en disco las posiciones de los vértices del mejor dibujo
+    encontrado, para empezar desde ahí cuando el grafo cambia un poco
+    (se agregan o quitan algunos vértices o aristas).
+
+    Las posiciones se guardan por nombre de vértice, junto con las
+    aristas y el costo del último dibujo guardado. Como en JSON las
+    llaves son cadenas, los nombres se guardan convertidos con str (dos
+    vértices cuyos nombres se escriben igual, como 1 y '1', se
+    confunden). Las posiciones de los vértices que ya no están en el grafo
+    se conservan por si vuelven a aparecer.
+
+    """
+    def __init__(self, archivo):
+        """
+        @param archivo: Nombre del archivo JSON del cache (no necesita
+                        existir).
+
+        """
+        self.archivo = archivo
+        self.posiciones, self.aristas, self.costo = {}, [], None
+        if os.path.exists(archivo):
+            with open(archivo) as f:
+                datos = json.load(f)
+            self.posiciones = {v: tuple(p)
+                               for (v, p) in datos['posiciones'].items()}
+            self.aristas = [tuple(a) for a in datos['aristas']]
+            self.costo = datos['costo']
+
+    @staticmethod
+    def _aristas(aristas):
+        """
+        Conjunto de aristas sin dirección, con los nombres como en el
+        cache.
+
+        """
+        return set(frozenset(map(str, a)) for a in aristas)
+
+    def estado_inicial(self, grafo, dispersion=20):
+        """
+        Construye un estado para grafo a partir del cache. Los vértices
+        conocidos conservan su posición, y cada vértice nuevo se coloca
+        cerca del promedio de sus vecinos conocidos (o al azar, si no
+        tiene).
+
+        La región que cambió está formada por los vértices nuevos, los
+        extremos de las aristas agregadas o quitadas, y los vecinos de
+        todos ellos.
+
+        @param grafo: Un objeto de la clase problema_grafica_grafo.
+        @param dispersion: Distancia máxima en pixeles entre un vértice
+                           nuevo y el promedio de sus vecinos.
+
+        @return: Una tupla (estado, moviles) donde moviles es la lista de
+                 índices de los vértices en la región que cambió, o None
+                 si el cache está vacío.
+
+        """
+        if not self.posiciones:
+            return grafo.estado_aleatorio(), None
+
+        def dentro(valor):
+            return max(10, min(grafo.dim - 10, int(round(valor))))
+
+        lugar = {v: (dentro(self.posiciones[str(v)][0]),
+                     dentro(self.posiciones[str(v)][1]))
+                 for v in grafo.vertices if str(v) in self.posiciones}
+        nuevos = [v for v in grafo.vertices if v not in lugar]
+
+        adyacentes = {v: set() for v in grafo.vertices}
+        for (v1, v2) in grafo.aristas:
+            adyacentes[v1].add(v2)
+            adyacentes[v2].add(v1)
+
+        azar = grafo.aleatorio.entero
+        for v in nuevos:
+            conocidos = [lugar[u] for u in adyacentes[v] if u in lugar]
+            if conocidos:
+                x = sum(p[0] for p in conocidos) / len(conocidos)
+                y = sum(p[1] for p in conocidos) / len(conocidos)
+                lugar[v] = (dentro(x + azar(-dispersion, dispersion)),
+                            dentro(y + azar(-dispersion, dispersion)))
+            else:
+                lugar[v] = (azar(10, grafo.dim - 10),
+                            azar(10, grafo.dim - 10))
+
+        nombres = {str(v): v for v in grafo.vertices}
+        cambio = set(nuevos)
+        cambiadas = self._aristas(self.aristas) ^ self._aristas(grafo.aristas)
+        for arista in cambiadas:
+            cambio.update(nombres[v] for v in arista if v in nombres)
+        region = set(cambio)
+        for v in cambio:
+            region.update(adyacentes[v])
+
+        estado = tuple(c for v in grafo.vertices for c in lugar[v])
+        moviles = [i for (i, v) in enumerate(grafo.vertices) if v in region]
+        return estado, moviles
+
+    def guarda(self, grafo, estado):
+        """
+        Guarda las posiciones de un dibujo del grafo. Si el grafo es el
+        mismo que el del cache y el dibujo guardado es mejor, no se
+        reemplaza.
+
+        @param grafo: Un objeto de la clase problema_grafica_grafo.
+        @param estado: Una tupla con un estado del grafo.
+
+        """
+        costo = grafo.costo(estado)
+        mismo = (set(map(str, grafo.vertices)) <= set(self.posiciones) and
+                 self._aristas(grafo.aristas) == self._aristas(self.aristas))
+        if mismo and self.costo is not None and self.costo <= costo:
+            return
+
+        self.posiciones.update((str(v), p) for (v, p) in
+                               grafo.estado2dic(estado).items())
+        self.aristas = [(str(v1), str(v2)) for (v1, v2) in grafo.aristas]
+        self.costo = costo
+
+        # Se escribe a un archivo temporal propio y se renombra, para no
+        # dejar el cache a medias si se interrumpe el programa y para que
+        # varios procesos puedan compartir el mismo cache
+        descriptor, temporal = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.archivo)),
+            prefix=os.path.basename(self.archivo) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, 'w') as f:
+                json.dump({'posiciones': self.posiciones,
+                           'aristas': self.aristas,
+                           'costo': self.costo}, f)
+            os.replace(temporal, self.archivo)
+        except BaseException:
+            os.remove(temporal)
+            raise
+
+
+def temple_incremental(grafo, cache, calendarización=None, tol=0.001,
+                       T_ini=1.0, maxit=None, aleatorio=None,
+                       tiempo_max=None, estadisticas=None):
+    """
+    Dibuja un grafo empezando desde el dibujo guardado en un cache. Solo
+    se mueven los vértices de la región que cambió, con un temple
+    simulado corto a baja temperatura, por lo que el resto del dibujo se
+    queda igual. Si el cache está vacío se hace un temple simulado
+    completo. En ambos casos el resultado se guarda en el cache.
+
+    @param grafo: Un objeto de la clase problema_grafica_grafo.
+    @param cache: Un objeto de la clase CacheDibujos.
+    @param calendarización: La calendarización usada en temple_simulado.
+    @param tol: Temperatura mínima considerada diferente a cero.
+    @param T_ini: Temperatura inicial del refinamiento.
+    @param maxit: Máximo número de iteraciones del refinamiento.
+    @param aleatorio: Un FlujoAleatorio para esta ejecución.
+    @param tiempo_max: Máximo tiempo de búsqueda en segundos.
+    @param estadisticas: Un diccionario en el que se suman las
+                         iteraciones realizadas.
+
+    @return: Una tupla con un estado del grafo.
+
+    """
+    if aleatorio is not None:
+        grafo.aleatorio = aleatorio
+    estado, moviles = cache.estado_inicial(grafo)
+
+    if moviles is None:
+        estado = blocales.temple_simulado(grafo, calendarización, tol,
+                                          tiempo_max=tiempo_max,
+                                          estadisticas=estadisticas)
+    elif moviles:
+        anteriores, grafo.moviles = grafo.moviles, moviles
+        try:
+            estado = blocales.temple_simulado(grafo, calendarización, tol,
+                                              estado_inicial=estado,
+                                              T_ini=T_ini, maxit=maxit,
+                                              tiempo_max=tiempo_max,
+                                              estadisticas=estadisticas)
+        finally:
+            grafo.moviles = anteriores
+
+    cache.guarda(grafo, estado)
+    return estado
+
+
 def main():
     """
     La función principal
@@ -422,34 +903,8 @@ def main():
     """
 
     # Vamos a definir un grafo sencillo
-    vertices_sencillo = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M']
-    aristas_sencillo = [('B', 'G'),
-                        ('E', 'F'),
-                        ('H', 'E'),
-                        ('D', 'B'),
-                        ('H', 'G'),
-                        ('A', 'E'),
-                        ('C', 'F'),
-                        ('H', 'B'),
-                        ('F', 'A'),
-                        ('C', 'B'),
-                        ('H', 'F'),
-                        ('H', 'I'),
-                        ('H', 'J'),
-                        ('H', 'K'),
-                        ('H', 'L'),
-                        ('H', 'M'),
-                        ('I', 'J'),
-                        ('I', 'K'),
-                        ('I', 'L'),
-                        ('I', 'M'),
-                        ('J', 'K'),
-                        ('J', 'L'),
-                        ('J', 'M'),
-                        ('K', 'L'),
-                        ('K', 'M'),
-                        ('L', 'M'),
-                        ('M', 'A')]
+    vertices_sencillo = VERTICES_SENCILLO
+    aristas_sencillo = ARISTAS_SENCILLO
     dimension = 400
 
     # Y vamos a hacer un dibujo del grafo sin decirle como hacer para
@@ -475,6 +930,16 @@ def main():
     print("Costo de la solución encontrada: {}".format(costo_final))
     print("Tiempo de ejecución en segundos: {}".format(t_final - t_inicial))
 
+    # Y lo mismo con el temple simulado multinivel
+    t_inicial = time.time()
+    solucion = temple_multinivel(grafo_sencillo, 5, "Logaritmo", 0.0004)
+    t_final = time.time()
+    costo_final = grafo_sencillo.costo(solucion)
+
+    print("\nUtilizando el temple simulado multinivel")
+    print("Costo de la solución encontrada: {}".format(costo_final))
+    print("Tiempo de ejecución en segundos: {}".format(t_final - t_inicial))
+
     ##########################################################################
     #                          20 PUNTOS
     ##########################################################################
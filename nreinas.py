@@ -13,8 +13,6 @@ __author__ = 'juliowaissman'
 
 import blocales
 import time
-from random import shuffle
-from random import sample
 from itertools import combinations
 
 
@@ -32,7 +30,7 @@ class ProblemaNreinas(blocales.Problema):
 
     def estado_aleatorio(self):
         estado = list(range(self.n))
-        shuffle(estado)
+        self.aleatorio.revuelve(estado)
         return tuple(estado)
 
     @staticmethod
@@ -60,6 +58,25 @@ class ProblemaNreinas(blocales.Problema):
             yield tuple(x)
             self.swap(x, i, j)
 
+    def vecinos_aleatorios(self, estado):
+        """
+        Generador de los vecinos de un estado en orden aleatorio. Solo se
+        revuelven los pares de posiciones, y cada vecino se construye
+        hasta que se necesita.
+
+        @param estado: una tupla que describe un estado.
+
+        @return: un generador de estados vecinos.
+
+        """
+        x = list(estado)
+        pares = list(combinations(range(self.n), 2))
+        self.aleatorio.revuelve(pares)
+        for i, j in pares:
+            self.swap(x, i, j)
+            yield tuple(x)
+            self.swap(x, i, j)
+
     def vecino_aleatorio(self, estado):
         """
         Genera un vecino de un estado intercambiando dos posiciones
@@ -71,7 +88,7 @@ class ProblemaNreinas(blocales.Problema):
 
         """
         vecino = list(estado)
-        i, j = sample(range(self.n), 2)
+        i, j = self.aleatorio.par(self.n)
         self.swap(vecino, i, j)
         return tuple(vecino)
 
@@ -88,13 +105,15 @@ class ProblemaNreinas(blocales.Problema):
                     if abs(estado[i] - estado[j]) == abs(i - j)))
 
 
-def prueba_descenso_colinas(problema=ProblemaNreinas(8), repeticiones=10):
+def prueba_descenso_colinas(problema=ProblemaNreinas(8), repeticiones=10,
+                            modo='completo', laterales=0):
     """ Prueba el algoritmo de descenso de colinas con n repeticiones """
 
     print("\n\n" + "intento".center(10) +
           "estado".center(60) + "costo".center(10))
     for intento in range(repeticiones):
-        solucion = blocales.descenso_colinas(problema)
+        solucion = blocales.descenso_colinas(problema, modo=modo,
+                                             laterales=laterales)
         print(str(intento).center(10) +
               str(solucion).center(60) +
               str(problema.costo(solucion)).center(10))
@@ -115,9 +134,9 @@ def prueba_temple_simulado_2(problema=ProblemaNreinas(8), calendarización=None)
     solucion = blocales.temple_simulado(problema, calendarización)
     if calendarización is None: 
         print("\n\nTemple simulado con calendarización To/(1 + i).")
-    elif calendarización is "Logaritmo":
+    elif calendarización == "Logaritmo":
         print("\n\nTemple simulado con calendarización T_ini/(1 + i*log(i)).")
-    elif calendarización is "Exponencial":
+    elif calendarización == "Exponencial":
         print("\n\nTemple simulado con calendarización T_ini * exp(-tol*i).")
 
     print("Costo de la solución: ", problema.costo(solucion))
@@ -131,6 +150,11 @@ if __name__ == "__main__":
     t_final = time.time()
     print("Tiempo de ejecución en segundos: {}".format(t_final - t_inicial))
 
+    t_inicial = time.time()
+    prueba_descenso_colinas(ProblemaNreinas(64), 10, 'primera_mejora', 100)
+    t_final = time.time()
+    print("Tiempo de ejecución en segundos: {}".format(t_final - t_inicial))
+
     t_inicial = time.time()
     prueba_temple_simulado(ProblemaNreinas(64))
     t_final = time.time()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+resuelve.py
+------------
+
+Punto de entrada en línea de comandos para resolver las n reinas o
+dibujar un grafo sin interfaz, pensado para lanzar muchos trabajos
+cortos. El resultado (estado, costo, iteraciones y tiempos) se escribe
+en JSON.
+
+Ejemplos:
+
+$python resuelve.py nreinas --n 64 --algoritmo descenso
+    --modo primera_mejora --laterales 100 --semilla 1
+
+$python resuelve.py grafo --grafo grafo.json --algoritmo multinivel
+    --calendarizacion Logaritmo --tol 0.0004 --tiempo 30 --dibuja final.gif
+
+Los módulos de cada problema (y Pillow) solo se importan cuando se
+necesitan, para que cada trabajo arranque rápido.
+
+"""
+
+__author__ = 'BrayanDurazo'
+
+import argparse
+import json
+import sys
+import time
+
+
+def argumentos(args=None):
+    """
+    Interpreta los argumentos de la línea de comandos.
+
+    @param args: Lista de argumentos (None para usar sys.argv).
+
+    @return: Un argparse.Namespace con los argumentos.
+
+    """
+    parser = argparse.ArgumentParser(
+        description="Resuelve las n reinas o dibuja un grafo con "
+                    "búsquedas locales y escribe el resultado en JSON.")
+    parser.add_argument('problema', choices=['nreinas', 'grafo'])
+    parser.add_argument('--n', type=int, default=8,
+                        help="Número de reinas.")
+    parser.add_argument('--grafo',
+                        help="Archivo JSON con las llaves vertices y "
+                             "aristas (por default el grafo de ejemplo).")
+    parser.add_argument('--dimension', type=int, default=400,
+                        help="Dimensión de la imagen del grafo en pixeles.")
+    parser.add_argument('--algoritmo', default='temple',
+                        choices=['descenso', 'temple', 'multinivel'])
+    parser.add_argument('--calendarizacion', default=None,
+                        choices=['Logaritmo', 'Exponencial'],
+                        help="Calendarización del temple simulado "
+                             "(por default T_ini/(1 + i)).")
+    parser.add_argument('--tol', type=float, default=0.001)
+    parser.add_argument('--modo', default='completo',
+                        choices=['completo', 'primera_mejora', 'muestreo'],
+                        help="Modo del descenso de colinas.")
+    parser.add_argument('--laterales', type=int, default=0)
+    parser.add_argument('--muestras', type=int, default=10)
+    parser.add_argument('--reinicios', type=int, default=1,
+                        help="Reinicios aleatorios del descenso de colinas.")
+    parser.add_argument('--procesos', type=int, default=None,
+                        help="Procesos para evaluar los vecinos en paralelo "
+                             "(descenso de colinas en modo completo).")
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--flujo', type=int, default=0,
+                        help="Flujo aleatorio (uno distinto por trabajo "
+                             "con la misma semilla).")
+    parser.add_argument('--tiempo', type=float, default=None,
+                        help="Tiempo máximo de búsqueda en segundos.")
+    parser.add_argument('--cache', default=None,
+                        help="Archivo JSON con el mejor dibujo anterior del "
+                             "grafo, para solo reacomodar lo que cambió.")
+    parser.add_argument('--dibuja', default=None,
+                        help="Archivo donde dibujar el grafo (requiere "
+                             "Pillow).")
+    parser.add_argument('--salida', default=None,
+                        help="Archivo JSON de salida (por default la "
+                             "salida estándar).")
+    opciones = parser.parse_args(args)
+    if opciones.algoritmo == 'multinivel' and opciones.problema != 'grafo':
+        parser.error("el algoritmo multinivel solo es para grafos")
+    if opciones.dibuja and opciones.problema != 'grafo':
+        parser.error("solo se pueden dibujar grafos")
+    if opciones.cache and (opciones.problema != 'grafo' or
+                           opciones.algoritmo != 'temple'):
+        parser.error("--cache solo es para el temple simulado de grafos")
+    if opciones.procesos and (opciones.algoritmo != 'descenso' or
+                              opciones.modo != 'completo'):
+        parser.error("--procesos solo es para el descenso en modo completo")
+    return opciones
+
+
+def crea_problema(opciones):
+    """
+    Construye el problema a resolver.
+
+    """
+    if opciones.problema == 'nreinas':
+        import nreinas
+        return nreinas.ProblemaNreinas(opciones.n)
+
+    import dibuja_grafo
+    if opciones.grafo is None:
+        vertices = dibuja_grafo.VERTICES_SENCILLO
+        aristas = dibuja_grafo.ARISTAS_SENCILLO
+    else:
+        with open(opciones.grafo) as f:
+            grafo = json.load(f)
+        vertices = grafo['vertices']
+        aristas = [tuple(arista) for arista in grafo['aristas']]
+    return dibuja_grafo.problema_grafica_grafo(vertices, aristas,
+                                               opciones.dimension)
+
+
+def busca(problema, opciones, estadisticas):
+    """
+    Ejecuta el algoritmo de búsqueda seleccionado.
+
+    @return: El estado encontrado.
+
+    """
+    import blocales
+
+    aleatorio = blocales.FlujoAleatorio(opciones.semilla, opciones.flujo)
+
+    if opciones.cache:
+        import dibuja_grafo
+        return dibuja_grafo.temple_incremental(
+            problema, dibuja_grafo.CacheDibujos(opciones.cache),
+            opciones.calendarizacion, opciones.tol, aleatorio=aleatorio,
+            tiempo_max=opciones.tiempo, estadisticas=estadisticas)
+
+    if opciones.algoritmo == 'temple':
+        return blocales.temple_simulado(problema, opciones.calendarizacion,
+                                        opciones.tol, aleatorio=aleatorio,
+                                        tiempo_max=opciones.tiempo,
+                                        estadisticas=estadisticas)
+
+    if opciones.algoritmo == 'multinivel':
+        import dibuja_grafo
+        return dibuja_grafo.temple_multinivel(
+            problema, calendarización=opciones.calendarizacion,
+            tol=opciones.tol, aleatorio=aleatorio,
+            tiempo_max=opciones.tiempo, estadisticas=estadisticas)
+
+    # El pool del evaluador paralelo se comparte entre todos los reinicios
+    evaluador = None
+    if opciones.procesos:
+        evaluador = blocales.EvaluadorParalelo(problema, opciones.procesos)
+    try:
+        return reinicia(problema, opciones, aleatorio, evaluador,
+                        estadisticas)
+    finally:
+        if evaluador is not None:
+            evaluador.cierra()
+
+
+def reinicia(problema, opciones, aleatorio, evaluador, estadisticas):
+    """
+    Descenso de colinas con reinicios aleatorios, mientras quede tiempo o
+    hasta encontrar un estado de costo 0.
+
+    @return: El mejor estado encontrado.
+
+    """
+    import blocales
+
+    limite = None if opciones.tiempo is None else time.time() + opciones.tiempo
+    mejor, costo_mejor = None, None
+    for _ in range(opciones.reinicios):
+        restante = None if limite is None else max(0, limite - time.time())
+        estado = blocales.descenso_colinas(problema, modo=opciones.modo,
+                                           muestras=opciones.muestras,
+                                           laterales=opciones.laterales,
+                                           aleatorio=aleatorio,
+                                           tiempo_max=restante,
+                                           estadisticas=estadisticas,
+                                           evaluador=evaluador)
+        costo = problema.costo(estado)
+        if mejor is None or costo < costo_mejor:
+            mejor, costo_mejor = estado, costo
+        if costo_mejor == 0 or restante == 0:
+            break
+    return mejor
+
+
+def main(args=None):
+    """
+    Resuelve un trabajo y escribe el resultado en JSON.
+
+    """
+    t_inicial = time.time()
+    opciones = argumentos(args)
+    problema = crea_problema(opciones)
+    t_carga = time.time()
+
+    # Los modos completo y primera_mejora necesitan el método vecinos
+    import blocales
+    if (opciones.algoritmo == 'descenso' and opciones.modo != 'muestreo' and
+            type(problema).vecinos is blocales.Problema.vecinos):
+        sys.stderr.write("resuelve.py: error: el problema {} no genera sus "
+                         "vecinos, use --modo muestreo\n"
+                         .format(opciones.problema))
+        sys.exit(2)
+
+    estadisticas = {'iteraciones': 0}
+    estado = busca(problema, opciones, estadisticas)
+    t_busqueda = time.time()
+    costo = problema.costo(estado)
+
+    tiempos = {'carga': t_carga - t_inicial,
+               'busqueda': t_busqueda - t_carga}
+    if opciones.dibuja:
+        problema.dibuja_grafo(estado, opciones.dibuja)
+        tiempos['dibujo'] = time.time() - t_busqueda
+    tiempos['total'] = time.time() - t_inicial
+
+    resultado = {'problema': opciones.problema,
+                 'algoritmo': opciones.algoritmo,
+                 'parametros': {'n': (opciones.n if opciones.problema ==
+                                      'nreinas' else None),
+                                'calendarizacion': opciones.calendarizacion,
+                                'tol': opciones.tol,
+                                'modo': opciones.modo,
+                                'laterales': opciones.laterales,
+                                'muestras': opciones.muestras,
+                                'reinicios': opciones.reinicios,
+                                'procesos': opciones.procesos,
+                                'cache': opciones.cache,
+                                'semilla': opciones.semilla,
+                                'flujo': opciones.flujo,
+                                'tiempo': opciones.tiempo},
+                 'estado': list(estado),
+                 'costo': costo,
+                 'iteraciones': estadisticas['iteraciones'],
+                 'tiempos': tiempos}
+
+    if opciones.salida is None:
+        json.dump(resultado, sys.stdout)
+        sys.stdout.write("\n")
+    else:
+        with open(opciones.salida, 'w') as f:
+            json.dump(resultado, f)
+
+
+if __name__ == '__main__':
+    main()